@@ -1,15 +1,17 @@
+import hashlib
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-from data_loader import load_dataset, process_entities, get_unique_locations
+from data_loader import connect_to_sheets, fetch_dataset
+from utils import CACHE_TTL, parse_dates
 from visualization import (
-    create_scorecard, 
     create_top_entities_chart, 
     create_timeline_chart,
     create_wordcloud,
-    create_side_by_side_wordclouds
+    token_frequencies
 )
 
 # Set page config
@@ -19,15 +21,136 @@ st.set_page_config(
     layout="wide"
 )
 
+# Arrow-backed string dtype for text columns
+STRING_DTYPE = pd.StringDtype("pyarrow")
+
+# High-cardinality join keys per sheet (by position), stripped and kept as Arrow strings
+KEY_COLUMNS = {
+    "DATASET SP": [0]  # Kolom A: judul SP, unik per baris
+}
+
+# Repeated string columns per sheet (by position), stripped and stored as categoricals
+CATEGORY_COLUMNS = {
+    "DATASET BERITA": [1, 3]  # Kolom B: referensi SP, Kolom D: media
+}
+
+# Date columns per sheet (by position), parsed once after load
+DATE_COLUMNS = {
+    "DATASET SP": [4],  # Kolom E: tanggal SP
+    "DATASET BERITA": [0]  # Kolom A: tanggal berita
+}
+
+# Sheets loaded by the dashboard
+SHEET_NAMES = ("DATASET SP", "DATASET BERITA")
+
+# Both sheets are read by position up to Kolom E
+MIN_COLUMNS = 5
+
+# Cached entries kept per derived result: a few dataset versions for whole-sheet
+# results, and one per press release choice for the per-SP trend results
+DATASET_CACHE_ENTRIES = 4
+SP_CACHE_ENTRIES = 256
+
+def _columns_at(df, positions):
+    """
+    Get column names at the given positions, skipping positions the sheet doesn't have
+    """
+    return [df.columns[i] for i in positions if i < len(df.columns)]
+
+def _prepare_dataset(df, sheet_name):
+    """
+    Validate a fetched sheet and convert its columns once for the dashboard
+    """
+    if df.empty:
+        raise ValueError(f"Tidak ada data di sheet {sheet_name}")
+    if len(df.columns) < MIN_COLUMNS:
+        raise ValueError(f"Sheet {sheet_name} hanya memiliki {len(df.columns)} kolom, dibutuhkan {MIN_COLUMNS}")
+    
+    # Strip join keys once so every consumer compares the same values
+    for col in _columns_at(df, KEY_COLUMNS.get(sheet_name, [])):
+        df[col] = df[col].astype(STRING_DTYPE).str.strip()
+    
+    # Few distinct values repeat per row here, so value_counts/groupby/isin work on
+    # int codes; categories stay Arrow strings like the SP titles they are matched to
+    for col in _columns_at(df, CATEGORY_COLUMNS.get(sheet_name, [])):
+        df[col] = df[col].astype(STRING_DTYPE).str.strip().astype('category')
+    
+    # Parse dates once so downstream functions don't re-parse on every rerun
+    for col in _columns_at(df, DATE_COLUMNS.get(sheet_name, [])):
+        df[col] = parse_dates(df[col])
+    
+    # Store the remaining free text as contiguous Arrow strings instead of Python objects
+    text_cols = df.select_dtypes(include='object').columns
+    df[text_cols] = df[text_cols].astype(STRING_DTYPE)
+    
+    return df
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner="Memuat data...")
+def load_datasets_cached(sheet_names, _client=None):
+    """
+    Load and prepare the given sheets, reusing the result across reruns
+    
+    Fetch failures and unusable sheets raise instead of returning an empty frame,
+    so Streamlit never caches them and the next rerun fetches again. Returns a
+    (frame, gspread error message or None) pair per sheet.
+    """
+    # Sheets are fetched concurrently; workers only do network I/O and never write
+    # to the page, the spinner and any messages stay on the script thread
+    with ThreadPoolExecutor(max_workers=len(sheet_names)) as executor:
+        fetched = list(executor.map(lambda sheet_name: fetch_dataset(sheet_name, _client), sheet_names))
+    
+    return [
+        (_prepare_dataset(df, sheet_name), gspread_error)
+        for sheet_name, (df, gspread_error) in zip(sheet_names, fetched)
+    ]
+
+# Content digests of live frames, keyed by id() and dropped when the frame is freed
+_FRAME_DIGESTS = {}
+
+def _frame_digest(df):
+    """
+    Hash a DataFrame by content, computing the digest only once per frame object
+    """
+    key = id(df)
+    entry = _FRAME_DIGESTS.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    
+    # Row hashes are digested in order, with the index, labels and dtypes, so
+    # reordered, relabelled or retyped frames never share a cache key
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = (
+        df.shape,
+        tuple(df.columns),
+        tuple(map(str, df.dtypes)),
+        hashlib.sha1(row_hashes.tobytes()).hexdigest(),
+    )
+    _FRAME_DIGESTS[key] = (weakref.ref(df, lambda _: _FRAME_DIGESTS.pop(key, None)), digest)
+    return digest
+
+# Hash cached DataFrame arguments by content instead of pickling them
+_DF_HASH_FUNCS = {
+    pd.DataFrame: _frame_digest
+}
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=DATASET_CACHE_ENTRIES, hash_funcs=_DF_HASH_FUNCS)
+def _sp_meta(df_sp, sp_title_col, sp_date_col):
+    """
+    Dropdown titles and date bounds for the press release selector
+    """
+    # Convert date column to datetime if not already
+    sp_dates = parse_dates(df_sp[sp_date_col])
+    
+    return tuple(df_sp[sp_title_col].dropna().unique()), sp_dates.min().date(), sp_dates.max().date()
+
 def create_sp_selector(df_sp, sp_title_col, sp_date_col):
     """
     Create a dropdown selector for press releases with date range filter
     """
-    # Add a "Semua Siaran Pers" option
-    sp_titles = ["Semua Siaran Pers"] + list(df_sp[sp_title_col].dropna().unique())
+    titles, min_date, max_date = _sp_meta(df_sp, sp_title_col, sp_date_col)
     
-    # Convert date column to datetime
-    df_sp[sp_date_col] = pd.to_datetime(df_sp[sp_date_col], errors='coerce')
+    # Add a "Semua Siaran Pers" option
+    sp_titles = ["Semua Siaran Pers"] + list(titles)
     
     # Date range selector
     col1, col2 = st.columns(2)
@@ -35,17 +158,17 @@ def create_sp_selector(df_sp, sp_title_col, sp_date_col):
     with col1:
         start_date = st.date_input(
             "Tanggal Mulai", 
-            min_value=df_sp[sp_date_col].min().date(), 
-            max_value=df_sp[sp_date_col].max().date(), 
-            value=df_sp[sp_date_col].min().date()
+            min_value=min_date, 
+            max_value=max_date, 
+            value=min_date
         )
     
     with col2:
         end_date = st.date_input(
             "Tanggal Akhir", 
-            min_value=df_sp[sp_date_col].min().date(), 
-            max_value=df_sp[sp_date_col].max().date(), 
-            value=df_sp[sp_date_col].max().date()
+            min_value=min_date, 
+            max_value=max_date, 
+            value=max_date
         )
     
     selected_sp = st.selectbox(
@@ -62,13 +185,15 @@ def filter_dataframe(df, title_col, date_col, selected_title, start_date, end_da
     Filter dataframe based on selected title and date range
     """
     # Convert columns to datetime if not already
-    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df = df.assign(**{date_col: parse_dates(df[date_col])})
     
-    # Filter by date range
-    df_filtered = df[
-        (df[date_col].dt.date >= start_date) & 
-        (df[date_col].dt.date <= end_date)
-    ]
+    # Filter by date range on the datetime64 values (end date inclusive); bounds take
+    # the column's time zone so tz-aware dates compare on their local calendar days
+    tz = df[date_col].dt.tz
+    start = pd.Timestamp(start_date, tz=tz)
+    end = pd.Timestamp(end_date, tz=tz) + pd.Timedelta(days=1)
+    df_filtered = df.loc[(df[date_col] >= start) & (df[date_col] < end)]
     
     # Filter by title
     if selected_title == "Semua Siaran Pers":
@@ -76,86 +201,157 @@ def filter_dataframe(df, title_col, date_col, selected_title, start_date, end_da
     else:
         return df_filtered[df_filtered[title_col] == selected_title]
 
-def count_media_per_sp(df_sp, df_berita, sp_title_col, berita_sp_ref_col):
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=DATASET_CACHE_ENTRIES, hash_funcs=_DF_HASH_FUNCS)
+def _berita_top_counts(df_berita, berita_sp_ref_col, berita_media_col):
+    """
+    Top 10 media and top 10 press releases by number of news items
+    """
+    media_counts = df_berita[berita_media_col].value_counts().head(10)
+    berita_per_sp = df_berita[berita_sp_ref_col].value_counts().head(10)
+    return media_counts, berita_per_sp
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=DATASET_CACHE_ENTRIES, hash_funcs=_DF_HASH_FUNCS)
+def count_media_per_sp(df_sp, df_berita, sp_title_col, berita_sp_ref_col, berita_media_col):
     """
     Count number of media per press release
     """
-    media_counts = {}
+    # Hitung jumlah media unik per SP dalam satu groupby
+    counts = df_berita.groupby(berita_sp_ref_col, observed=True, sort=False)[berita_media_col].nunique()
+    
+    # SP tanpa pemberitaan tetap dihitung dengan 0 media; the categorical reference
+    # index is cast to the title dtype first, Arrow strings don't compare to categoricals
+    titles = df_sp[sp_title_col]
+    counts.index = counts.index.astype(titles.dtype)
+    return counts.reindex(titles.unique(), fill_value=0)
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=DATASET_CACHE_ENTRIES, hash_funcs=_DF_HASH_FUNCS)
+def _explode_entities(df, title_col, entity_col, date_col):
+    """
+    Split semicolon-separated entities into one row per mention with its SP title and date
+    """
+    dates = parse_dates(df[date_col])
     
-    for sp_title in df_sp[sp_title_col]:
-        # Filter berita yang merujuk ke SP ini
-        related_berita = df_berita[df_berita[berita_sp_ref_col] == sp_title]
-        
-        # Hitung jumlah media unik
-        unique_media = related_berita[df_berita.columns[3]].nunique()
-        media_counts[sp_title] = unique_media
+    # Split entities separated by semicolon into one row per mention
+    entities = df.loc[dates.notna(), entity_col].dropna().astype(str).str.split(';').explode().str.strip()
+    entities = entities[entities.notna() & (entities != '')]
     
-    return media_counts
+    return pd.DataFrame({
+        'SiaranPers': df.loc[entities.index, title_col].to_numpy(),
+        'Narasumber': entities.to_numpy(),
+        'Tanggal': dates.loc[entities.index].to_numpy()
+    })
 
-def create_sources_trend_analysis(df, entity_col, date_col, selected_sp=None):
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=SP_CACHE_ENTRIES, hash_funcs=_DF_HASH_FUNCS)
+def _compute_weekly_counts(df, title_col, entity_col, date_col, selected_sp=None):
     """
-    Create scatter plot for sources mentioning trend with improved visualization
+    Compute weekly mention frequency of the top sources for the trend analysis
     """
+    # Mentions are exploded once for the whole dataset and shared across SP selections
+    mentions = _explode_entities(df, title_col, entity_col, date_col)
+    
     # Filter dataframe if a specific SP is selected
     if selected_sp is not None and selected_sp != "Semua Siaran Pers":
-        df = df[df[df.columns[0]] == selected_sp]
+        df = df[df[title_col] == selected_sp]
+        mentions = mentions[mentions['SiaranPers'] == selected_sp]
     
     # Ensure dataframe is not empty
     if df.empty:
-        st.warning("Tidak ada data untuk dianalisis")
-        return
-    
-    # Convert date column
-    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-    df = df.dropna(subset=[date_col])
-    
-    # Prepare entity data
-    all_entities_data = []
+        return None
     
-    for _, row in df.iterrows():
-        date = row[date_col]
-        # Split entities separated by semicolon
-        entities = row[entity_col].split(';') if pd.notna(row[entity_col]) else []
-        
-        for entity in entities:
-            entity = entity.strip()
-            if entity:
-                all_entities_data.append({
-                    'Narasumber': entity,
-                    'Tanggal': date
-                })
+    # Count SP with a valid date without writing the parsed column back into df
+    total_sp = int(parse_dates(df[date_col]).notna().sum())
     
     # Create DataFrame
-    if not all_entities_data:
-        st.warning("Tidak ada narasumber yang ditemukan")
-        return
+    if mentions.empty:
+        return total_sp, None, None
     
-    entities_df = pd.DataFrame(all_entities_data)
+    # Count total frequencies straight from the mentions
+    narasumber_counts = mentions['Narasumber'].value_counts()
     
-    # Agregasi per minggu dengan datetime
-    def get_week_start(date):
-        return date - pd.Timedelta(days=date.weekday())
+    # Select top 10 sources for visualization
+    top_sources = narasumber_counts.head(10)
+    
+    # Only the top sources are aggregated per week
+    entities_df = mentions.loc[mentions['Narasumber'].isin(top_sources.index), ['Narasumber', 'Tanggal']].copy()
     
-    entities_df['Minggu'] = entities_df['Tanggal'].apply(get_week_start)
+    # Agregasi per minggu (Senin-Minggu) dengan datetime
+    entities_df['Minggu'] = entities_df['Tanggal'].dt.to_period('W-SUN').dt.start_time
     
     # Group by week and count
-    weekly_counts = entities_df.groupby(['Narasumber', 'Minggu']).size().reset_index(name='Frekuensi')
+    plot_data = entities_df.groupby(['Narasumber', 'Minggu'], observed=True).size().reset_index(name='Frekuensi')
     
     # Tambahkan rentang tanggal minggu
-    def get_week_range(week_start):
-        end = week_start + pd.Timedelta(days=6)
-        return f"{week_start.day}-{end.day} {week_start.strftime('%B %Y')}"
+    week_start = plot_data['Minggu']
+    week_end = week_start + pd.Timedelta(days=6)
+    plot_data['RentangMinggu'] = (
+        week_start.dt.day.astype(str) + '-' + week_end.dt.day.astype(str) + ' ' + week_start.dt.strftime('%B %Y')
+    )
     
-    weekly_counts['RentangMinggu'] = weekly_counts['Minggu'].apply(get_week_range)
+    return total_sp, narasumber_counts, plot_data
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=SP_CACHE_ENTRIES, hash_funcs=_DF_HASH_FUNCS)
+def _build_scatter(plot_data):
+    """
+    Build the sources trend scatter figure from the weekly counts
+    """
+    # One WebGL trace for all sources; each source gets a palette color by integer code
+    codes, _ = pd.factorize(plot_data['Narasumber'])
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure(go.Scattergl(
+        x=plot_data['Minggu'],
+        y=plot_data['Narasumber'],
+        mode='markers',
+        customdata=plot_data[['Narasumber', 'RentangMinggu', 'Frekuensi']].to_numpy(),
+        hovertemplate='<b>%{customdata[0]}</b><br>%{customdata[1]}<br>Frekuensi: %{customdata[2]} kali<extra></extra>',
+        marker=dict(
+            color=codes % len(palette),
+            colorscale=palette,
+            cmin=0,
+            cmax=len(palette) - 1,
+            size=plot_data['Frekuensi'],
+            sizemode='area',
+            sizeref=2. * plot_data['Frekuensi'].max() / (20 ** 2),  # Same scaling as px size_max=20
+            line=dict(width=1, color='DarkSlateGrey'),
+            opacity=0.7
+        )
+    ))
     
-    # Count total frequencies
-    narasumber_counts = weekly_counts.groupby('Narasumber')['Frekuensi'].sum().sort_values(ascending=False)
+    # Sources with the most mentions at the top
+    source_order = plot_data.groupby('Narasumber', observed=True)['Frekuensi'].sum().sort_values().index.tolist()
     
-    # Select top 10 sources for visualization
-    top_sources = narasumber_counts.head(10)
+    # Customize layout
+    fig.update_layout(
+        title='📌 Scatter Plot Tren Penyebutan Narasumber',
+        height=350,
+        yaxis={
+            'categoryorder': 'array',
+            'categoryarray': source_order,
+            'tickfont': dict(size=10)  # Mengecilkan font nama narasumber
+        },
+        xaxis_title="Pekan",
+        yaxis_title="Narasumber",
+        showlegend=False,
+        title_font_size=16
+    )
+    
+    return fig
+
+def create_sources_trend_analysis(df, title_col, entity_col, date_col, selected_sp=None):
+    """
+    Create scatter plot for sources mentioning trend with improved visualization
+    """
+    trend = _compute_weekly_counts(df, title_col, entity_col, date_col, selected_sp)
     
-    # Prepare data for top sources
-    plot_data = weekly_counts[weekly_counts['Narasumber'].isin(top_sources.index)]
+    # Ensure dataframe is not empty
+    if trend is None:
+        st.warning("Tidak ada data untuk dianalisis")
+        return
+    
+    total_sp, narasumber_counts, plot_data = trend
+    
+    if narasumber_counts is None:
+        st.warning("Tidak ada narasumber yang ditemukan")
+        return
     
     # Metrics with custom styling
     col1, col2, col3 = st.columns([1,1,1])
@@ -170,7 +366,7 @@ def create_sources_trend_analysis(df, entity_col, date_col, selected_sp=None):
             <h4 style="margin:0; color:#555;">Total Siaran Pers</h4>
             <h2 style="margin:5px 0 0; color:#333;">{}</h2>
         </div>
-        """.format(len(df)), unsafe_allow_html=True)
+        """.format(total_sp), unsafe_allow_html=True)
     
     with col2:
         st.markdown(f"""
@@ -185,8 +381,8 @@ def create_sources_trend_analysis(df, entity_col, date_col, selected_sp=None):
         """, unsafe_allow_html=True)
     
     with col3:
-        top_narasumber = top_sources.index[0]
-        top_narasumber_count = top_sources.iloc[0]
+        top_narasumber = narasumber_counts.index[0]
+        top_narasumber_count = narasumber_counts.iloc[0]
         st.markdown(f"""
         <div style="background-color:rgba(240,240,240,0.5); 
                     border-radius:10px; 
@@ -199,58 +395,35 @@ def create_sources_trend_analysis(df, entity_col, date_col, selected_sp=None):
         </div>
         """, unsafe_allow_html=True)
     
-    # Create scatter plot with Plotly
-    fig = px.scatter(
-        plot_data, 
-        x='Minggu', 
-        y='Narasumber',
-        color='Narasumber',
-        size='Frekuensi',
-        size_max=20,
-        title='📌 Scatter Plot Tren Penyebutan Narasumber',
-        labels={'Narasumber': 'Narasumber', 'Minggu': 'Minggu'},
-        height=350,
-        custom_data=['Narasumber', 'RentangMinggu', 'Frekuensi']
-    )
-    
-    # Customize hover template
-    fig.update_traces(
-        hovertemplate='<b>%{customdata[0]}</b><br>%{customdata[1]}<br>Frekuensi: %{customdata[2]} kali<extra></extra>',
-        marker=dict(
-            line=dict(width=1, color='DarkSlateGrey'),
-            opacity=0.7
-        )
-    )
-    
-    # Customize layout
-    fig.update_layout(
-        yaxis={
-            'categoryorder':'total ascending',
-            'tickfont': dict(size=10)  # Mengecilkan font nama narasumber
-        },
-        xaxis_title="Pekan",
-        yaxis_title="Narasumber",
-        showlegend=False,
-        title_font_size=16
-    )
-    
+    fig = _build_scatter(plot_data)
     st.plotly_chart(fig, use_container_width=True)
 
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=DATASET_CACHE_ENTRIES, hash_funcs=_DF_HASH_FUNCS)
+def _compute_sankey_data(df_berita, sp_title_col, media_col):
+    """
+    Count news per (SP reference, media) pair for the Sankey diagram
+    """
+    # Group by SP reference and media, keeping the 10 most frequent pairs
+    return (
+        df_berita.groupby([sp_title_col, media_col], observed=True, sort=False)
+        .size()
+        .reset_index(name='count')
+        .nlargest(10, 'count')
+    )
+
 def create_media_sources_sankey(df_berita, sp_title_col, media_col):
     """
     Create Sankey diagram for sources in news
     """
-    # Group by SP reference and media
-    sankey_data = df_berita.groupby([sp_title_col, media_col]).size().reset_index(name='count').head(10)
+    sankey_data = _compute_sankey_data(df_berita, sp_title_col, media_col)
     
-    # Prepare data for Sankey diagram
-    sources = sankey_data[sp_title_col].tolist()
-    targets = sankey_data[media_col].tolist()
-    values = sankey_data['count'].tolist()
+    # Integer node codes in order of first appearance, computed by pandas' factorizer
+    source_codes, unique_sources = pd.factorize(sankey_data[sp_title_col])
+    target_codes, unique_targets = pd.factorize(sankey_data[media_col])
+    unique_sources = list(unique_sources)
+    unique_targets = list(unique_targets)
     
     # Create color palette
-    unique_sources = list(set(sources))
-    unique_targets = list(set(targets))
     color_palette = px.colors.qualitative.Plotly
     
     # Create Sankey diagram
@@ -263,9 +436,9 @@ def create_media_sources_sankey(df_berita, sp_title_col, media_col):
           color = color_palette[:len(unique_sources)] + color_palette[:len(unique_targets)]
         ),
         link = dict(
-          source = [unique_sources.index(s) for s in sources],
-          target = [len(unique_sources) + unique_targets.index(t) for t in targets],
-          value = values
+          source = source_codes,
+          target = target_codes + len(unique_sources),
+          value = sankey_data['count'].to_numpy()
       ))])
 
     fig.update_layout(title_text="Aliran Pemberitaan dari Siaran Pers ke Media", font_size=10)
@@ -275,15 +448,19 @@ def main():
     # Title
     st.title("Dashboard Analisis Siaran Pers & Pemberitaan")
     
-    # Load data
-    with st.spinner("Memuat data..."):
-        df_sp = load_dataset("DATASET SP")
-        df_berita = load_dataset("DATASET BERITA")
-    
-    if df_sp.empty and df_berita.empty:
-        st.error("Gagal memuat data")
+    # Load data (cached, fetched once per TTL)
+    client, _, _ = connect_to_sheets()
+    try:
+        (df_sp, sp_gspread_error), (df_berita, berita_gspread_error) = load_datasets_cached(SHEET_NAMES, client)
+    except Exception as e:
+        # Not cached, so the next rerun tries the sheets again
+        st.error(f"Gagal memuat data: {e}")
         return
     
+    for sheet_name, gspread_error in zip(SHEET_NAMES, (sp_gspread_error, berita_gspread_error)):
+        if gspread_error:
+            st.warning(f"Gagal mengakses sheet {sheet_name} dengan gspread: {gspread_error}. Data diambil dari ekspor CSV.")
+    
     # Column definitions
     sp_title_col = df_sp.columns[0]  # Kolom A
     sp_content_col = df_sp.columns[1]  # Kolom B
@@ -320,6 +497,7 @@ def main():
         st.subheader("Trend Penyebutan Narasumber")
         create_sources_trend_analysis(
             df_sp, 
+            sp_title_col, 
             sp_sources_col, 
             sp_date_col, 
             selected_sp
@@ -340,24 +518,25 @@ def main():
         total_berita = len(df_berita)
         st.metric("Total Pemberitaan", total_berita)
         
+        # Media and SP rankings are counted once per dataset
+        media_counts, berita_per_sp = _berita_top_counts(df_berita, berita_sp_ref_col, berita_media_col)
+        
         # 2. Top 10 Media
         st.subheader("Top 10 Media")
-        media_counts = df_berita[berita_media_col].value_counts().head(10)
         create_top_entities_chart(media_counts, "Top 10 Media", 10)
         
         # 3. Rata-rata Media per Siaran Pers
-        media_per_sp = count_media_per_sp(df_sp, df_berita, sp_title_col, berita_sp_ref_col)
-        avg_media = np.mean(list(media_per_sp.values()))
+        media_per_sp = count_media_per_sp(df_sp, df_berita, sp_title_col, berita_sp_ref_col, berita_media_col)
+        avg_media = media_per_sp.mean()
         st.metric("Rata-rata Media per Siaran Pers", f"{avg_media:.2f}")
         
         # 4. Top 10 Siaran Pers dengan Pemberitaan Terbanyak
         st.subheader("Top 10 Siaran Pers dengan Pemberitaan Terbanyak")
-        berita_per_sp = df_berita[berita_sp_ref_col].value_counts().head(10)
         create_top_entities_chart(berita_per_sp, "Top 10 Siaran Pers", 10)
         
         # 5. Wordcloud Konten Berita
         st.subheader("Wordcloud Konten Berita")
-        create_wordcloud(df_berita[berita_content_col], "Wordcloud Pemberitaan")
+        create_wordcloud(token_frequencies(df_berita[berita_content_col]), "Wordcloud Pemberitaan")
         
         # 6. Sankey Diagram Narasumber di Berita
         st.subheader("Aliran Pemberitaan")
@@ -367,12 +546,14 @@ def main():
     with tab3:
         st.write("Analisis lanjutan akan ditambahkan")
     
-    # Expanded Data Tables
+    # Expanded Data Tables (only serialized once the user asks for them)
     with st.expander("Detail Siaran Pers"):
-        st.dataframe(df_sp)
+        if st.checkbox("Tampilkan tabel", key="show_sp"):
+            st.dataframe(df_sp)
     
     with st.expander("Detail Pemberitaan"):
-        st.dataframe(df_berita)
+        if st.checkbox("Tampilkan tabel", key="show_berita"):
+            st.dataframe(df_berita)
 
 if __name__ == "__main__":
     main()
@@ -3,29 +3,40 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import streamlit as st
 
+@st.cache_resource(show_spinner=False)
+def get_sheets_client():
+    """
+    Create the authorized gspread client from the service account in Streamlit Secrets
+    """
+    # Convert the Streamlit secrets dict to a service account info dict
+    credentials_dict = st.secrets["gcp_service_account"]
+    
+    # Create credentials
+    scope = ['https://spreadsheets.google.com/feeds',
+            'https://www.googleapis.com/auth/drive']
+    
+    credentials = ServiceAccountCredentials.from_json_keyfile_dict(
+        credentials_dict, scope)
+    
+    # Authorize and get the Google Sheets client
+    return gspread.authorize(credentials)
+
+# Spreadsheet ID and its per-sheet CSV export URL prefix
+SHEET_ID = "1OrofvXQ5a-H27SR5YtrTkv4szzRRDQ6KUELGAVMWbVg"
+CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:csv&sheet="
+
 def connect_to_sheets():
     """
     Connect to Google Sheets using service account from Streamlit Secrets
     """
-    # Spreadsheet ID
-    sheet_id = "1OrofvXQ5a-H27SR5YtrTkv4szzRRDQ6KUELGAVMWbVg"
-    url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet="
+    sheet_id = SHEET_ID
+    url = CSV_URL
     
     try:
         # Get credentials from Streamlit Secrets
         if 'gcp_service_account' in st.secrets:
-            # Convert the Streamlit secrets dict to a service account info dict
-            credentials_dict = st.secrets["gcp_service_account"]
-            
-            # Create credentials
-            scope = ['https://spreadsheets.google.com/feeds',
-                    'https://www.googleapis.com/auth/drive']
-            
-            credentials = ServiceAccountCredentials.from_json_keyfile_dict(
-                credentials_dict, scope)
-            
-            # Authorize and get the Google Sheets client
-            client = gspread.authorize(credentials)
+            # Authorized client is built once and shared across reruns
+            client = get_sheets_client()
             
             return client, sheet_id, url
         else:
@@ -35,38 +46,68 @@ def connect_to_sheets():
         st.error(f"Error connecting to Google Sheets: {e}")
         return None, sheet_id, url
 
+def read_sheet_csv(csv_url):
+    """
+    Read a sheet CSV export straight into Arrow-backed columns
+    
+    The default C parser is kept on purpose: it renames duplicate headers to
+    'name.1' and blank ones to 'Unnamed: i', which the pyarrow engine does not.
+    """
+    return pd.read_csv(csv_url, dtype_backend='pyarrow')
+
+def _unique_headers(headers):
+    """
+    Make gspread headers unique the same way read_csv does
+    """
+    seen = {}
+    unique = []
+    for i, name in enumerate(headers):
+        name = name if str(name).strip() else f"Unnamed: {i}"
+        candidate = name
+        while candidate in seen:
+            seen[name] += 1
+            candidate = f"{name}.{seen[name]}"
+        seen[candidate] = 0
+        unique.append(candidate)
+    return unique
+
+def fetch_dataset(sheet_name, client=None):
+    """
+    Fetch a sheet as a DataFrame without writing anything to the page
+    
+    Raises when the sheet cannot be read. Returns the frame and the gspread error
+    message that forced the CSV fallback, or None.
+    """
+    gspread_error = None
+    if client:
+        # Use gspread client to open the sheet
+        try:
+            worksheet = client.open_by_key(SHEET_ID).worksheet(sheet_name)
+            data = worksheet.get_all_values()
+            
+            # Convert to pandas DataFrame
+            if not data:
+                return pd.DataFrame(), None
+            return pd.DataFrame(data[1:], columns=_unique_headers(data[0])), None
+        except Exception as e:
+            gspread_error = str(e)
+    
+    # Direct CSV access, also the fallback if gspread fails
+    return read_sheet_csv(f"{CSV_URL}{sheet_name}"), gspread_error
+
 def load_dataset(sheet_name):
     """
     Load dataset from specific sheet
     """
     try:
-        client, sheet_id, url = connect_to_sheets()
+        client, _, _ = connect_to_sheets()
+        df, gspread_error = fetch_dataset(sheet_name, client)
         
-        if client:
-            # Use gspread client to open the sheet
-            try:
-                spreadsheet = client.open_by_key(sheet_id)
-                worksheet = spreadsheet.worksheet(sheet_name)
-                data = worksheet.get_all_values()
-                
-                # Convert to pandas DataFrame
-                if data:
-                    headers = data[0]
-                    values = data[1:]
-                    df = pd.DataFrame(values, columns=headers)
-                    return df
-                else:
-                    st.warning(f"Tidak ada data di sheet {sheet_name}")
-                    return pd.DataFrame()
-            except Exception as e:
-                st.warning(f"Gagal mengakses sheet dengan gspread: {e}. Mencoba metode alternatif...")
-                # Fallback to direct CSV access if gspread fails
-                df = pd.read_csv(f"{url}{sheet_name}")
-                return df
-        else:
-            # Fallback to direct CSV access
-            df = pd.read_csv(f"{url}{sheet_name}")
-            return df
+        if gspread_error:
+            st.warning(f"Gagal mengakses sheet dengan gspread: {gspread_error}. Mencoba metode alternatif...")
+        if df.empty:
+            st.warning(f"Tidak ada data di sheet {sheet_name}")
+        return df
     except Exception as e:
         st.error(f"Error loading data from sheet {sheet_name}: {e}")
         return pd.DataFrame()
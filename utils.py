@@ -1,15 +1,33 @@
 import re
-import nltk
-from nltk.corpus import stopwords
+from collections import Counter
+from functools import lru_cache
+
+import pandas as pd
+
+# Sheets are refetched hourly, so data-derived caches expire on the same schedule
+CACHE_TTL = 3600
+
+_nltk_resources_ready = False
 
 def download_nltk_resources():
     """Download required NLTK resources"""
+    global _nltk_resources_ready
+    if _nltk_resources_ready:
+        return
+    _nltk_resources_ready = True
     try:
+        # Imported here so NLTK only loads once stopwords are first needed
+        import nltk
         nltk.download('stopwords', quiet=True)
         nltk.download('punkt', quiet=True)
     except Exception as e:
         print(f"Error downloading NLTK resources: {e}")
 
+# Patterns used to clean text for the wordcloud
+PUNCT_PATTERN = re.compile(r'[^\w\s]')
+DIGIT_PATTERN = re.compile(r'\d+')
+SPACE_PATTERN = re.compile(r'\s+')
+
 # Indonesian stopwords
 INDONESIAN_STOPWORDS = [
     'yang', 'dan', 'di', 'dengan', 'untuk', 'pada', 'ke', 'dari', 'dalam',
@@ -27,17 +45,19 @@ INDONESIAN_STOPWORDS = [
     'dll', 'dst', 'dsb', 'etc', 'dll', 'hal', 'saat', 'nya'
 ]
 
+@lru_cache(maxsize=1)
 def get_stopwords():
-    """Get combined stopwords list"""
+    """Get combined stopwords set, built once per process"""
     download_nltk_resources()
     try:
+        from nltk.corpus import stopwords
         stop_words = set(stopwords.words('indonesian'))
     except:
         stop_words = set()
     
     # Combine with custom Indonesian stopwords
     stop_words.update(INDONESIAN_STOPWORDS)
-    return stop_words
+    return frozenset(stop_words)
 
 def clean_text(text):
     """Clean text for wordcloud processing"""
@@ -47,21 +67,38 @@ def clean_text(text):
     # Convert to lowercase
     text = text.lower()
     # Remove special characters and numbers
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\d+', ' ', text)
+    text = PUNCT_PATTERN.sub(' ', text)
+    text = DIGIT_PATTERN.sub(' ', text)
     # Remove extra spaces
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = SPACE_PATTERN.sub(' ', text).strip()
     
     return text
 
 def prepare_text_for_wordcloud(text_series):
-    """Prepare text data for wordcloud"""
-    # Combine all text
-    all_text = ' '.join(text_series.apply(clean_text).fillna(''))
+    """Prepare word frequencies for wordcloud"""
+    # Clean and tokenize all rows with vectorized string operations, same steps as clean_text
+    tokens = (
+        text_series.dropna().astype(str)
+        .str.lower()
+        .str.replace(PUNCT_PATTERN, ' ', regex=True)
+        .str.replace(DIGIT_PATTERN, ' ', regex=True)
+        .str.split()
+        .explode()
+        .dropna()
+    )
     
-    # Remove stopwords
-    stop_words = get_stopwords()
-    words = all_text.split()
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
+    # Count first, then drop stopwords and short words once per distinct word
+    counts = tokens.value_counts()
+    vocab = counts.index
+    counts = counts[~vocab.isin(get_stopwords()) & (vocab.str.len() > 2)]
     
-    return ' '.join(filtered_words)
+    return Counter(counts.to_dict())
+
+def parse_dates(values):
+    """Parse a column to datetime64, trying the fast ISO 8601 parser before format inference"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    try:
+        return pd.to_datetime(values, format='ISO8601')
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, errors='coerce')
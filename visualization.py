@@ -1,9 +1,14 @@
+from io import BytesIO
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+
+from utils import CACHE_TTL, parse_dates, prepare_text_for_wordcloud
+
+# Daily timelines longer than this are aggregated per week
+MAX_TIMELINE_POINTS = 2000
 
 def create_scorecard(value, label):
     """
@@ -16,74 +21,128 @@ def create_top_entities_chart(data, title, top_n=10):
     Create bar chart for top entities
     """
     sorted_data = data.sort_values(ascending=False).head(20)
-    fig = px.bar(
-        x=sorted_data.values, 
-        y=sorted_data.index, 
+    fig = go.Figure(go.Bar(
+        x=sorted_data.to_numpy(), 
+        y=sorted_data.index.to_numpy(), 
         orientation='h',
-        title=title,
-        labels={'y': 'Entitas', 'x': 'Jumlah'}
-    )
+        hovertemplate='Jumlah=%{x}<br>Entitas=%{y}<extra></extra>'
+    ))
+    fig.update_layout(title=title, xaxis_title='Jumlah', yaxis_title='Entitas')
     st.plotly_chart(fig, use_container_width=True)
 
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=32)
+def _timeline_counts(dates, date_col):
+    """
+    Count rows per day for the timeline, per week for long ranges
+    
+    date_col names the result column and is passed explicitly because Streamlit's
+    Series hash ignores the name. Returns the counts and whether they were summed per week.
+    """
+    dates = parse_dates(dates)
+    
+    # Count per calendar day on the raw datetime64 values, skipping NaT; tz-aware
+    # dates keep their local wall time instead of being shifted to UTC days
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    values = dates.to_numpy(dtype='datetime64[ns]')
+    days, counts = np.unique(values[~np.isnat(values)].astype('datetime64[D]'), return_counts=True)
+    timeline_data = pd.DataFrame({date_col: days.astype('datetime64[ns]'), 'Jumlah': counts})
+    
+    # Long ranges are summed per week so the browser gets a bounded number of points
+    per_week = len(timeline_data) > MAX_TIMELINE_POINTS
+    if per_week:
+        weeks = timeline_data[date_col].dt.to_period('W-SUN').dt.start_time
+        timeline_data = timeline_data.groupby(weeks)['Jumlah'].sum().rename_axis(date_col).reset_index()
+    
+    return timeline_data, per_week
+
 def create_timeline_chart(df, title_col, date_col, chart_title):
     """
     Create timeline chart for dates
     """
-    # Convert date column to datetime
-    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    # Nothing to hash or draw when the filter left no rows
+    if len(df) == 0 or date_col not in df.columns:
+        st.warning("Tidak ada data untuk ditampilkan")
+        return
     
-    # Group by date and count
-    timeline_data = df.groupby(df[date_col].dt.date).size().reset_index()
-    timeline_data.columns = [date_col, 'Jumlah']
+    # Counting is cached on the date column, only the figure is rebuilt per rerun
+    timeline_data, per_week = _timeline_counts(df[date_col], date_col)
     
-    fig = px.line(
-        timeline_data, 
-        x=date_col, 
-        y='Jumlah', 
-        title=chart_title
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    # Label weekly sums as such so they are not read as daily counts
+    if per_week:
+        chart_title = f"{chart_title} (per minggu)"
+        x_label = f"{date_col} (awal minggu)"
+        y_label = 'Jumlah per minggu'
+    else:
+        x_label = date_col
+        y_label = 'Jumlah'
+    
+    fig = go.Figure(go.Scatter(
+        x=timeline_data[date_col].to_numpy(), 
+        y=timeline_data['Jumlah'].to_numpy(), 
+        mode='lines',
+        hovertemplate=f'{x_label}=%{{x}}<br>{y_label}=%{{y}}<extra></extra>'
+    ))
+    fig.update_layout(title=chart_title, xaxis_title=x_label, yaxis_title=y_label)
+    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
 
-def create_wordcloud(text_series, title):
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=8)
+def token_frequencies(text_series):
+    """
+    Count wordcloud tokens once, dropping punctuation, digits and stopwords
     """
-    Create word cloud from text series
+    return prepare_text_for_wordcloud(text_series)
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL, max_entries=8)
+def wordcloud_png(frequencies, width=800, height=400):
     """
-    # Combine all text
-    text = ' '.join(text_series.dropna().astype(str))
+    Render a word cloud from word frequencies to PNG bytes
+    """
+    # Imported here so the wordcloud package only loads when a cloud is drawn
+    from wordcloud import WordCloud
     
-    # Generate word cloud
+    # Generate word cloud straight from the counts, no text re-tokenizing
     wordcloud = WordCloud(
-        width=800, 
-        height=400, 
+        width=width, 
+        height=height, 
         background_color='white'
-    ).generate(text)
+    ).generate_from_frequencies(dict(frequencies))
+    
+    # Encode WordCloud's own image, no matplotlib figure in between; fast zlib level,
+    # st.image sends the bytes as they are
+    buf = BytesIO()
+    wordcloud.to_image().save(buf, format='PNG', optimize=False, compress_level=1)
+    return buf.getvalue()
+
+def create_wordcloud(frequencies, title):
+    """
+    Create word cloud from a word -> count mapping
+    """
+    if not len(frequencies):
+        st.warning(f"Tidak ada kata untuk {title}")
+        return
     
     # Display word cloud
-    plt.figure(figsize=(10,5))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    plt.title(title)
-    st.pyplot(plt)
+    st.image(wordcloud_png(frequencies), caption=title, use_column_width=True)
 
 def create_side_by_side_wordclouds(series1, series2, title1, title2):
     """
     Create two word clouds side by side
     """
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16,8))
+    # Count words once per text and reuse the counts across reruns; WordCloud
+    # then skips its own tokenizing
+    freq1 = token_frequencies(series1)
+    freq2 = token_frequencies(series2)
+    if not freq1 or not freq2:
+        st.warning(f"Tidak ada kata untuk {title1 if not freq1 else title2}")
+        return
+    
+    col1, col2 = st.columns(2)
     
     # Word cloud 1
-    text1 = ' '.join(series1.dropna().astype(str))
-    wordcloud1 = WordCloud(width=400, height=200, background_color='white').generate(text1)
-    ax1.imshow(wordcloud1, interpolation='bilinear')
-    ax1.set_title(title1)
-    ax1.axis('off')
+    with col1:
+        st.image(wordcloud_png(freq1, 400, 200), caption=title1, use_column_width=True)
     
     # Word cloud 2
-    text2 = ' '.join(series2.dropna().astype(str))
-    wordcloud2 = WordCloud(width=400, height=200, background_color='white').generate(text2)
-    ax2.imshow(wordcloud2, interpolation='bilinear')
-    ax2.set_title(title2)
-    ax2.axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    with col2:
+        st.image(wordcloud_png(freq2, 400, 200), caption=title2, use_column_width=True)